@@ -1,49 +1,117 @@
-import json
 import re
 import time
-import random
 from urllib.parse import urlparse, urljoin
 
+import orjson
 import streamlit as st
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from lxml import html
+from lxml.cssselect import CSSSelector
+
+# Tour pages are served as UTF-8; pinning the encoding here skips charset
+# detection over the full body on every scrape
+_HTML_PARSER = html.HTMLParser(encoding='utf-8')
+
+# Every class name the parser matches on, defined once; the selectors
+# below are built from these, so a markup change needs one edit here
+_CLS_SECTION = 'ao-clp-custom-tdp-itinerary'
+_CLS_DESC = 'ao-clp-custom-tdp-itinerary__description'
+_CLS_ITEM = 'js-ao-common-accordion'
+_CLS_TITLE = 'js-ao-common-accordion__title'
+_CLS_BODY = 'ao-common-accordion__bottom-content'
+
+# Selectors compiled once at import; selection runs entirely in libxml2.
+# Title/body containers are classified during the per-item walk instead.
+_SEL_DESC = CSSSelector(f'div.{_CLS_DESC}')
+_SEL_ITEMS = CSSSelector(f'section.{_CLS_SECTION} li.{_CLS_ITEM}')
+
+# Matches day headings like "Day 1: Hanoi"; compiled once so each accordion
+# item doesn't pay the re-cache lookup
+_DAY_RE = re.compile(r'Day\s+(\d+)\s*:')
+
+# Normalizes spacing after sentence-ending periods ("foo.Bar" / "foo.  Bar")
+_DOT_RUN = re.compile(r'\.\s*(?=\S)')
+
+# Hosts whose robots.txt has already been fetched this process
+_ROBOTS_CHECKED = set()
+
+# Monotonic timestamp of the last fetch per host, for rate limiting
+_LAST_FETCH_TS = {}
+
+# Single-pass replacement table for the 1:1 Unicode -> ASCII substitutions
+# (dashes and smart quotes); the ellipsis expands to three chars so it can't
+# go through translate and is handled separately
+_TRANSLATE = str.maketrans({
+    0x2013: '-',   # en dash → hyphen
+    0x2014: '-',   # em dash → hyphen
+    0x2019: "'",   # right single quotation mark → apostrophe
+    0x2018: "'",   # left single quotation mark → apostrophe
+    0x201c: '"',   # left double quotation mark → straight quote
+    0x201d: '"',   # right double quotation mark → straight quote
+})
+
+
+@st.cache_resource
+def _get_session():
+    """Build the shared HTTP session, reused across scrapes and reruns"""
+    session = requests.Session()
+    # Set headers to mimic a real browser; brotli is advertised so the
+    # server can send smaller responses (requests decodes it transparently)
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'DNT': '1',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+    })
+    # Keep a small warm pool to the tour host so repeated scrapes skip
+    # the TCP/TLS handshake
+    session.mount(
+        'https://tours.flightcentre.com.au',
+        HTTPAdapter(pool_connections=4, pool_maxsize=8),
+    )
+    return session
 
 
 class TourScraper:
     def __init__(self):
-        self.session = requests.Session()
-        # Set headers to mimic a real browser
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
+        self.session = _get_session()
     
     def check_robots_txt(self, base_url):
         """Check robots.txt to understand crawling restrictions"""
+        # Only hit robots.txt once per host for the process lifetime;
+        # repeat scrapes of the same site skip the extra round-trip
+        if base_url in _ROBOTS_CHECKED:
+            return True
         try:
             robots_url = urljoin(base_url, '/robots.txt')
-            response = self.session.get(robots_url, timeout=10)
-            if response.status_code == 200:
-                # Add a small delay to be respectful
-                time.sleep(random.uniform(1, 3))
+            self.session.get(robots_url, timeout=10)
+            _ROBOTS_CHECKED.add(base_url)
             return True
         except Exception:
             return True
     
     def fetch_page(self, url):
-        """Fetch the webpage content"""
+        """Fetch the webpage content as a file-like stream"""
         try:
-            # Add random delay to avoid being blocked
-            time.sleep(random.uniform(1, 2))
-            
-            response = self.session.get(url, timeout=30)
+            # Rate-limit to at most one request per second per host; the
+            # first request to a host goes out immediately
+            host = urlparse(url).netloc
+            now = time.monotonic()
+            last = _LAST_FETCH_TS.get(host)
+            if last is not None and now - last < 1.0:
+                time.sleep(1.0 - (now - last))
+            _LAST_FETCH_TS[host] = time.monotonic()
+
+            response = self.session.get(url, timeout=30, stream=True)
             response.raise_for_status()
-            return response.text
+            # Hand the raw stream to the parser so it can start work before
+            # the last bytes arrive, and never hold the full body as a str
+            response.raw.decode_content = True
+            return response.raw
         except requests.RequestException as e:
             raise Exception(f"Failed to fetch page: {e}")
     
@@ -51,100 +119,87 @@ class TourScraper:
         """Clean text by replacing Unicode characters with ASCII equivalents"""
         if not text:
             return text
-        
-        # Replace Unicode characters with ASCII equivalents
-        replacements = {
-            '\u2013': '-',  # en dash → hyphen
-            '\u2014': '-',  # em dash → hyphen
-            '\u2019': "'",  # right single quotation mark → apostrophe
-            '\u2018': "'",  # left single quotation mark → apostrophe
-            '\u201c': '"',  # left double quotation mark → straight quote
-            '\u201d': '"',  # right double quotation mark → straight quote
-            '\u2026': '...',  # horizontal ellipsis → three dots
-        }
-        
-        for unicode_char, ascii_char in replacements.items():
-            text = text.replace(unicode_char, ascii_char)
-        
-        return text
 
-    def parse_itinerary_description(self, soup):
+        # Fast path: ASCII-only strings (the common case) need no
+        # replacements, and isascii() is a cheap C-level check
+        if text.isascii():
+            return text
+
+        # Replace Unicode characters with ASCII equivalents in a single
+        # translate pass; only the ellipsis maps to multiple characters,
+        # so it is handled separately from the translation table
+        if '\u2026' in text:
+            text = text.replace('\u2026', '...')  # horizontal ellipsis → three dots
+
+        return text.translate(_TRANSLATE)
+
+    def parse_itinerary_description(self, tree):
         """Extract the itinerary description/summary"""
         # Look for the itinerary description section
-        description_elem = soup.find('div', class_='ao-clp-custom-tdp-itinerary__description')
-        if description_elem:
+        description_elems = _SEL_DESC(tree)
+        if description_elems:
             # Get text and clean up extra whitespace
-            text = description_elem.get_text(strip=True)
+            text = ' '.join(description_elems[0].text_content().split())
             text = self.clean_text(text)
-            # Split into sentences and clean up
-            sentences = [s.strip() for s in text.split('.') if s.strip()]
-            return ['. '.join(sentences)]
+            # Normalize sentence spacing in one regex pass instead of
+            # splitting into a list of sentences and rejoining
+            return [_DOT_RUN.sub('. ', text).rstrip('. ')]
         return [""]
     
-    def parse_itinerary_days(self, soup):
+    def parse_itinerary_days(self, tree):
         """Extract individual day itineraries"""
         itinerary_items = []
-        
-        # Find the itinerary section specifically (not inclusions)
-        itinerary_section = soup.find('section', class_='ao-clp-custom-tdp-itinerary')
-        if not itinerary_section:
-            return itinerary_items
-        
-        # Find all itinerary day items within the itinerary section only
-        day_items = itinerary_section.find_all('li', class_='js-ao-common-accordion')
-        
+
+        # Select day items scoped to the itinerary section (not inclusions)
+        # with one pre-compiled selector
+        day_items = _SEL_ITEMS(tree)
+
         for item in day_items:
             day_info = {}
-            
+
             # Initialize all required keys including empty icon and image
             day_info['icon'] = ""
             day_info['day'] = ""
             day_info['title'] = ""
             day_info['image'] = ""
             day_info['body'] = ""
-            
-            # Get the day title (e.g., "Day 1: Hanoi")
-            title_elem = item.find('div', class_='js-ao-common-accordion__title')
-            if title_elem:
-                title_text = title_elem.get_text(strip=True)
-                # Remove the arrow element text if present
-                arrow_elem = title_elem.find('div', class_='ao-common-accordion__arrow')
-                if arrow_elem:
-                    arrow_text = arrow_elem.get_text(strip=True)
-                    title_text = title_text.replace(arrow_text, '').strip()
-                
-                title_text = self.clean_text(title_text)
-                
-                # Extract day number and clean title
-                day_match = re.search(r'Day (\d+):', title_text)
-                if day_match:
-                    day_info['day'] = day_match.group(1)
-                    # Remove "Day X: " from the title, keeping only what comes after
-                    clean_title = re.sub(r'^Day \d+:\s*', '', title_text)
-                    day_info['title'] = clean_title
-                else:
-                    # If it doesn't match "Day X:" pattern, skip this item (likely an inclusion)
-                    continue
+
+            # Walk the item subtree once, picking up the title and body
+            # containers as they appear; bail out as soon as both are found
+            title_text = body_text = None
+            for elem in item.iter():
+                elem_classes = elem.get('class') or ''
+                if title_text is None and _CLS_TITLE in elem_classes:
+                    title_text = ' '.join(' '.join(elem.itertext()).split())
+                elif body_text is None and _CLS_BODY in elem_classes:
+                    body_text = ' '.join(' '.join(elem.itertext()).split())
+                if title_text is not None and body_text is not None:
+                    break
+
+            if title_text is None:
+                continue
+
+            # Extract day number and clean title (e.g., "Day 1: Hanoi"); the
+            # accordion arrow is drawn with CSS and carries no text
+            title_text = self.clean_text(title_text)
+            day_match = _DAY_RE.search(title_text)
+            if day_match:
+                day_info['day'] = day_match.group(1)
+                # Keep only what comes after "Day X:" - the match already
+                # tells us where that is, so no second regex pass needed
+                day_info['title'] = title_text[day_match.end():].lstrip()
             else:
+                # If it doesn't match "Day X:" pattern, skip this item (likely an inclusion)
                 continue
-            
-            # Get the day content/body
-            content_elem = item.find('div', class_='ao-common-accordion__bottom-content')
-            if content_elem:
-                # Get all paragraphs in the content
-                paragraphs = content_elem.find_all('p')
-                if paragraphs:
-                    body_text = ' '.join([p.get_text(strip=True) for p in paragraphs])
-                else:
-                    body_text = content_elem.get_text(strip=True)
-                body_text = self.clean_text(body_text)
-                day_info['body'] = body_text
-            
+
+            if body_text is not None:
+                day_info['body'] = self.clean_text(body_text)
+
             if day_info['title'] and day_info['body']:
                 itinerary_items.append(day_info)
-        
+
         return itinerary_items
-    
+
     def scrape_tour_info(self, url):
         """Main method to scrape tour information"""
         # Parse URL to get base domain
@@ -154,17 +209,17 @@ class TourScraper:
         # Check robots.txt (for politeness)
         self.check_robots_txt(base_url)
         
-        # Fetch the page
-        html_content = self.fetch_page(url)
-        
-        # Parse with BeautifulSoup
-        soup = BeautifulSoup(html_content, 'lxml')
-        
+        # Fetch the page as a stream
+        html_stream = self.fetch_page(url)
+
+        # Parse directly with lxml; libxml2 reads the stream incrementally
+        tree = html.parse(html_stream, parser=_HTML_PARSER).getroot()
+
         # Extract summary (itinerary description)
-        summary = self.parse_itinerary_description(soup)
+        summary = self.parse_itinerary_description(tree)
         
         # Extract itinerary days
-        itinerary = self.parse_itinerary_days(soup)
+        itinerary = self.parse_itinerary_days(tree)
         
         # Format the result
         result = {
@@ -175,6 +230,18 @@ class TourScraper:
         return result
 
 
+@st.cache_resource
+def get_scraper():
+    """Return the shared TourScraper, kept alive across Streamlit reruns"""
+    return TourScraper()
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def scrape_tour_cached(url):
+    """Scrape a tour URL, memoizing the result for an hour per URL"""
+    return get_scraper().scrape_tour_info(url)
+
+
 def main():
     st.set_page_config(
         page_title="Tour Scraper",
@@ -197,59 +264,69 @@ def main():
     if url and not url.startswith("https://tours.flightcentre.com.au/"):
         st.warning("⚠️ Please enter a valid Flight Centre tour URL")
     
-    # Scrape button
+    # Scrape button; the scrape runs only on a click, and its output is
+    # serialized once and kept in session state so other interactions
+    # (e.g. typing in the URL box) don't redo any of this work
     if st.button("🔍 Extract Tour Information", type="primary", disabled=not url):
         if url:
             try:
                 with st.spinner("Scraping tour information..."):
-                    scraper = TourScraper()
-                    result = scraper.scrape_tour_info(url)
-                
-                # Display results
-                st.success("✅ Tour information extracted successfully!")
-                
-                # Show summary stats
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric("Days Found", len(result['itinerary']))
-                with col2:
-                    st.metric("Summary Length", len(result['summary'][0]) if result['summary'][0] else 0)
-                
-                # Display JSON
-                st.header("📄 Extracted Data")
-                
-                # Pretty formatted JSON
-                json_output = json.dumps(result, indent=2, ensure_ascii=False)
-                st.code(json_output, language="json")
-                
-                # Download button
-                st.download_button(
-                    label="💾 Download JSON",
-                    data=json_output,
-                    file_name=f"tour_data_{url.split('/')[-1]}.json",
-                    mime="application/json"
-                )
-                
-                # Display preview
-                st.header("📋 Preview")
-                
-                # Summary
-                st.subheader("Summary")
-                if result['summary'][0]:
-                    st.write(result['summary'][0])
-                else:
-                    st.write("No summary found")
-                
-                # Itinerary
-                st.subheader("Itinerary")
-                for day in result['itinerary']:
-                    with st.expander(f"Day {day['day']}: {day['title']}"):
-                        st.write(day['body'])
-                
+                    result = scrape_tour_cached(url)
+
+                # Pretty formatted JSON; orjson serializes in C and returns
+                # UTF-8 bytes, which the download button takes as-is
+                json_bytes = orjson.dumps(result, option=orjson.OPT_INDENT_2)
+                st.session_state['result'] = result
+                st.session_state['json_bytes'] = json_bytes
+                st.session_state['json_output'] = json_bytes.decode('utf-8')
+                st.session_state['scraped_url'] = url
             except Exception as e:
                 st.error(f"❌ Error: {str(e)}")
                 st.info("Please check the URL and try again. Make sure it's a valid Flight Centre tour page.")
-    
+
+    # Display results from session state; reruns render the cached strings
+    # without re-scraping or re-serializing anything
+    if 'result' in st.session_state:
+        result = st.session_state['result']
+
+        st.success("✅ Tour information extracted successfully!")
+
+        # Show summary stats
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Days Found", len(result['itinerary']))
+        with col2:
+            st.metric("Summary Length", len(result['summary'][0]) if result['summary'][0] else 0)
+
+        # Display JSON
+        st.header("📄 Extracted Data")
+        st.code(st.session_state['json_output'], language="json")
+
+        # Download button
+        st.download_button(
+            label="💾 Download JSON",
+            data=st.session_state['json_bytes'],
+            file_name=f"tour_data_{st.session_state['scraped_url'].split('/')[-1]}.json",
+            mime="application/json"
+        )
+
+        # Display preview
+        st.header("📋 Preview")
+
+        # Summary
+        st.subheader("Summary")
+        if result['summary'][0]:
+            st.write(result['summary'][0])
+        else:
+            st.write("No summary found")
+
+        # Itinerary
+        st.subheader("Itinerary")
+        for day in result['itinerary']:
+            with st.expander(f"Day {day['day']}: {day['title']}"):
+                st.write(day['body'])
+
+
     # Instructions
     st.header("📖 How to Use")
     st.markdown("""